@@ -3,6 +3,8 @@
 Unit tests for text frequency analyzer with Pydantic validation.
 """
 
+import os
+import threading
 import pytest
 from pathlib import Path
 from unittest.mock import patch, mock_open
@@ -40,7 +42,12 @@ class TestTextAnalyzer:
         text = "Python3 is AWESOME!!!"
         cleaned = analyzer.clean_text(text)
         assert cleaned == "python3 is awesome"
-    
+
+        # Test with non-ASCII text
+        text = "Earth’s ÉCLAT, naïve!"
+        cleaned = analyzer.clean_text(text)
+        assert cleaned == "earths éclat naïve"
+
     def test_analyze_file_success(self, tmp_path):
         """Test successful file analysis."""
         analyzer = TextAnalyzer()
@@ -63,6 +70,35 @@ class TestTextAnalyzer:
         assert result.word_frequencies[0].word == "python"
         assert result.word_frequencies[0].count == 3
     
+    def test_analyze_file_validates_result_when_requested(self, tmp_path):
+        """Test that TFA_VALIDATE=1 builds the result through full validation."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+
+        config = AnalysisConfig(filepath=test_file, min_length=2)
+        with patch.dict('os.environ', {'TFA_VALIDATE': '1'}):
+            with patch.object(AnalysisResult, 'model_construct', side_effect=AssertionError):
+                result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert result.total_words == 6
+
+    def test_analyze_file_validation_rejects_invalid_rows(self, tmp_path, capsys):
+        """Test that TFA_VALIDATE=1 also validates the word rows."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("x² ok", encoding='utf-8')
+
+        config = AnalysisConfig(filepath=test_file, min_length=1)
+        # Let a non-alphabetic word through the tokenizer
+        with patch('text_frequency_analyzer._split_letters', side_effect=str.split):
+            with patch.dict('os.environ', {'TFA_VALIDATE': '1'}):
+                result = analyzer.analyze_file(config)
+
+        assert result is None
+        assert "Word must contain only alphabetic characters" in capsys.readouterr().out
+
     def test_analyze_file_with_min_length_filter(self, tmp_path):
         """Test file analysis with minimum length filtering."""
         analyzer = TextAnalyzer()
@@ -85,6 +121,186 @@ class TestTextAnalyzer:
         assert "big" not in word_list
         assert "is" not in word_list
     
+    def test_analyze_file_splits_words_on_non_letters(self, tmp_path):
+        """Test that punctuation is removed like clean_text and digits separate words."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+
+        test_content = "Python3 rocks! python_fans can't love PYTHON's high-level speed"
+        test_file.write_text(test_content)
+
+        config = AnalysisConfig(filepath=test_file, min_length=4)
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        # "python", "rocks", "python", "fans", "cant", "love", "pythons",
+        # "highlevel", "speed"
+        assert result.total_words == 9
+        word_list = [wf.word for wf in result.word_frequencies]
+        assert word_list[0] == "python"
+        assert result.word_frequencies[0].count == 2
+        assert "cant" in word_list
+        assert "pythons" in word_list
+        assert "highlevel" in word_list
+
+    def test_analyze_file_with_non_ascii_text(self, tmp_path):
+        """Test that non-ASCII words are counted and lowercased."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+
+        test_content = "Café’s CAFÉ café\nnaïve cafe"
+        test_file.write_text(test_content, encoding='utf-8')
+
+        config = AnalysisConfig(filepath=test_file, min_length=2)
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        # "cafés", "café", "café", "naïve", "cafe"
+        assert result.total_words == 5
+        assert result.word_frequencies[0].word == "café"
+        assert result.word_frequencies[0].count == 2
+        assert "cafés" in [wf.word for wf in result.word_frequencies]
+
+    def test_analyze_file_splits_words_on_numeric_characters(self, tmp_path):
+        """Test that numeric characters regex treats as word characters split words."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("x² half½ Ⅻ ok ok", encoding='utf-8')
+
+        config = AnalysisConfig(filepath=test_file, min_length=1)
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        # "x", "half", "ok", "ok"
+        assert result.total_words == 4
+        assert all(wf.word.isalpha() for wf in result.word_frequencies)
+        assert [wf.word for wf in result.word_frequencies] == ["ok", "x", "half"]
+
+    def test_analyze_file_keeps_first_seen_order_for_ties(self, tmp_path):
+        """Test that tied ASCII and non-ASCII words rank in first-seen order."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("naïve python zebra éclair apple", encoding='utf-8')
+
+        config = AnalysisConfig(filepath=test_file, min_length=1)
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert [wf.word for wf in result.word_frequencies] == [
+            "naïve", "python", "zebra", "éclair", "apple"
+        ]
+
+    def test_analyze_directory(self, tmp_path):
+        """Test that a directory combines the counts of its .txt files."""
+        analyzer = TextAnalyzer()
+        (tmp_path / "first.txt").write_text("python is great python")
+        (tmp_path / "second.txt").write_text("python is fun")
+        (tmp_path / "notes.md").write_text("ignored ignored ignored ignored")
+
+        config = AnalysisConfig(filepath=tmp_path, min_length=2)
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert result.total_words == 7
+        assert result.unique_words == 4  # python, is, great, fun
+        assert result.word_frequencies[0].word == "python"
+        assert result.word_frequencies[0].count == 3
+
+    def test_analyze_file_in_parallel(self, tmp_path):
+        """Test that parallel counting matches sequential counting."""
+        import text_frequency_analyzer
+
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great\npython is fun\n" * 50 + "python rocks")
+
+        sequential = analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=2))
+        # Counts are cached regardless of the worker count, so drop them
+        text_frequency_analyzer._count_cache.clear()
+        text_frequency_analyzer._selection_cache.clear()
+        # Force several workers even on a single-core machine
+        with patch('os.cpu_count', return_value=3):
+            parallel = analyzer.analyze_file(
+                AnalysisConfig(filepath=test_file, min_length=2, parallel=True)
+            )
+
+        assert parallel is not None
+        assert parallel.total_words == sequential.total_words == 302
+        assert parallel.unique_words == sequential.unique_words
+        assert parallel.word_frequencies == sequential.word_frequencies
+
+    def test_analyze_file_in_parallel_without_newlines(self, tmp_path):
+        """Test that a file that cannot be split is counted without a process pool."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+
+        with patch('os.cpu_count', return_value=3):
+            with patch('concurrent.futures.ProcessPoolExecutor', side_effect=AssertionError):
+                result = analyzer.analyze_file(
+                    AnalysisConfig(filepath=test_file, min_length=2, parallel=True)
+                )
+
+        assert result is not None
+        assert result.total_words == 6
+
+    def test_analyze_file_reuses_counts_across_parallel_setting(self, tmp_path):
+        """Test that toggling parallel counting does not re-read a cached file."""
+        import text_frequency_analyzer
+
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+
+        assert analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=2)).total_words == 6
+        with patch.object(text_frequency_analyzer, '_tokenize_file', side_effect=AssertionError):
+            with patch('os.cpu_count', return_value=3):
+                result = analyzer.analyze_file(
+                    AnalysisConfig(filepath=test_file, min_length=3, parallel=True)
+                )
+
+        assert result is not None
+        assert result.total_words == 4
+
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="requires os.mkfifo")
+    def test_analyze_file_from_pipe(self, tmp_path):
+        """Test that non-regular files such as FIFOs are read rather than treated as empty."""
+        analyzer = TextAnalyzer()
+        fifo = tmp_path / "words.fifo"
+        os.mkfifo(fifo)
+
+        def write_fifo():
+            with open(fifo, 'w') as f:
+                f.write("python python rocks\n")
+
+        # A daemon writer blocked opening an unread FIFO cannot hang the suite
+        writer = threading.Thread(target=write_fifo, daemon=True)
+        writer.start()
+        result = analyzer.analyze_file(AnalysisConfig(filepath=fifo, min_length=1))
+        writer.join(timeout=5)
+
+        assert not writer.is_alive()
+
+        assert result is not None
+        assert result.total_words == 3
+        assert result.word_frequencies[0].word == "python"
+        assert result.word_frequencies[0].count == 2
+
+    def test_analyze_file_reporting_zero_size(self, tmp_path):
+        """Test that regular files reporting size 0, like /proc files, are still read."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python python rocks\n")
+
+        fields = list(os.stat(test_file))
+        fields[6] = 0  # st_size
+        with patch('os.stat', return_value=os.stat_result(fields)):
+            result = analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=1))
+
+        assert result is not None
+        assert result.total_words == 3
+        assert result.word_frequencies[0].word == "python"
+
     def test_analyze_file_no_words_matching_criteria(self, tmp_path):
         """Test analysis when no words match the criteria."""
         analyzer = TextAnalyzer()
@@ -102,6 +318,87 @@ class TestTextAnalyzer:
         assert result is None
         mock_print.assert_called_with("No words found matching the criteria.")
     
+    def test_analyze_file_reuses_counts_until_file_changes(self, tmp_path):
+        """Test that repeated analyses of an unchanged file skip re-reading it."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+
+        result = analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=2))
+        assert result.total_words == 6
+
+        # A different min_length is served from the cached counts
+        with patch('builtins.open', side_effect=IOError("Read error")):
+            result = analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=3))
+        assert result is not None
+        assert result.total_words == 4
+
+        # Changing the file invalidates the cached counts
+        test_file.write_text("python python python rocks")
+        result = analyzer.analyze_file(AnalysisConfig(filepath=test_file, min_length=3))
+        assert result.total_words == 4
+        assert result.word_frequencies[0].count == 3
+
+    def test_analyze_file_reuses_counts_from_cache_dir(self, tmp_path):
+        """Test that counts saved in a cache directory are reused by later runs."""
+        import text_frequency_analyzer
+
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+        config = AnalysisConfig(filepath=test_file, min_length=2, cache_dir=tmp_path / "cache")
+
+        assert analyzer.analyze_file(config).total_words == 6
+        assert len(list((tmp_path / "cache").glob("*.pickle"))) == 1
+
+        # Simulate a new run: clear the in-memory caches and forbid tokenizing
+        text_frequency_analyzer._count_cache.clear()
+        text_frequency_analyzer._selection_cache.clear()
+        with patch.object(text_frequency_analyzer, '_tokenize_file', side_effect=AssertionError):
+            result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert result.total_words == 6
+        assert result.word_frequencies[0].word == "python"
+
+    def test_analyze_file_ignores_unusable_cache_file(self, tmp_path):
+        """Test that a cache file holding something other than counts is a miss."""
+        import pickle
+        from collections import Counter
+        import text_frequency_analyzer
+
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+        config = AnalysisConfig(filepath=test_file, min_length=2, cache_dir=tmp_path / "cache")
+
+        assert analyzer.analyze_file(config).total_words == 6
+        cache_file, = (tmp_path / "cache").glob("*.pickle")
+        cache_file.write_bytes(pickle.dumps(["python", "python"]))
+
+        text_frequency_analyzer._count_cache.clear()
+        text_frequency_analyzer._selection_cache.clear()
+        result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert result.total_words == 6
+        assert isinstance(pickle.loads(cache_file.read_bytes()), Counter)
+
+    def test_analyze_file_removes_partial_cache_file(self, tmp_path):
+        """Test that a failed cache write leaves no temporary file behind."""
+        analyzer = TextAnalyzer()
+        test_file = tmp_path / test_file_path
+        test_file.write_text("python is great python is fun")
+        cache_dir = tmp_path / "cache"
+        config = AnalysisConfig(filepath=test_file, min_length=2, cache_dir=cache_dir)
+
+        with patch('os.replace', side_effect=OSError("Disk full")):
+            result = analyzer.analyze_file(config)
+
+        assert result is not None
+        assert result.total_words == 6
+        assert list(cache_dir.iterdir()) == []
+
     def test_analyze_file_handles_file_read_error(self, tmp_path):
         """Test analysis handles file read errors gracefully."""
         analyzer = TextAnalyzer()
@@ -111,7 +408,7 @@ class TestTextAnalyzer:
         config = AnalysisConfig(filepath=test_file)
         
         # Mock file read to raise an exception
-        with patch.object(Path, 'read_text', side_effect=IOError("Read error")):
+        with patch('builtins.open', side_effect=IOError("Read error")):
             with patch('builtins.print') as mock_print:
                 result = analyzer.analyze_file(config)
         
@@ -156,16 +453,10 @@ class TestMainFunction:
     """Test cases for the main function."""
     
     @patch('text_frequency_analyzer.TextAnalyzer')
-    @patch('argparse.ArgumentParser.parse_args')
-    def test_main_success_flow(self, mock_args, mock_analyzer_class):
+    def test_main_success_flow(self, mock_analyzer_class):
         """Test successful main function execution."""
         from text_frequency_analyzer import main
         
-        # Mock command line arguments
-        mock_args.return_value.file = test_file_path
-        mock_args.return_value.top = 5
-        mock_args.return_value.min_length = 2
-        
         # Mock analyzer and result
         mock_analyzer = mock_analyzer_class.return_value
         mock_result = AnalysisResult(
@@ -178,7 +469,7 @@ class TestMainFunction:
         mock_analyzer.analyze_file.return_value = mock_result
         
         with patch('builtins.print'):
-            main()
+            main(Path(test_file_path), top_n=5, min_word_length=2)
         
         # Verify analyzer was called with correct config
         mock_analyzer.analyze_file.assert_called_once()
@@ -190,18 +481,13 @@ class TestMainFunction:
         # Verify display_results was called
         mock_analyzer.display_results.assert_called_once_with(mock_result)
     
-    @patch('argparse.ArgumentParser.parse_args')
-    def test_main_validation_error(self, mock_args):
+    def test_main_validation_error(self):
         """Test main function handles validation errors."""
         from text_frequency_analyzer import main
         
-        # Mock invalid arguments
-        mock_args.return_value.file = test_file_path
-        mock_args.return_value.top = 0  # Invalid: should be >= 1
-        mock_args.return_value.min_length = 3
-        
         with patch('builtins.print') as mock_print:
-            main()
+            # Invalid: top_n should be >= 1
+            main(Path(test_file_path), top_n=0, min_word_length=3)
         
         # Should print configuration error
         mock_print.assert_called()
@@ -4,37 +4,312 @@ Text Frequency Analyzer with Pydantic
 Analyzes word frequency in text files using Pydantic for data validation and modeling.
 """
 
+import heapq
+import mmap
+import os
 import re
-import typer
-from collections import Counter
+import string
+import sys
+from collections import Counter, OrderedDict
+from contextlib import suppress
+from functools import reduce
+from itertools import repeat
+from operator import iadd, itemgetter
 from pathlib import Path
-from typing import List, Optional
+from stat import S_ISDIR, S_ISREG
+from typing import Callable, List, Optional, Tuple, TypeVar
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+# ASCII characters that the regex [^\w\s] would strip
+_ASCII_PUNCTUATION = ''.join(
+    ch for ch in map(chr, range(128)) if not (ch.isalnum() or ch == '_' or ch.isspace())
+)
+
+# Single-pass translation table for ASCII text: lowercases letters and deletes
+# punctuation.
+_CLEAN_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase, _ASCII_PUNCTUATION)
+
+# Punctuation stripper for non-ASCII text, which the table cannot handle
+_CLEAN_SUB = re.compile(r'[^\w\s]').sub
+
+# Tokenizing table for file bytes. Like clean_text it lowercases ASCII letters
+# and deletes punctuation (so "can't" counts as "cant"); digits, underscores
+# and whitespace then separate words. Non-ASCII bytes are kept so UTF-8
+# sequences stay whole.
+_SEPARATORS = bytes(
+    byte for byte in range(128) if not chr(byte).isalpha() and chr(byte) not in _ASCII_PUNCTUATION
+)
+_TOKEN_TABLE = bytes.maketrans(
+    string.ascii_uppercase.encode('ascii') + _SEPARATORS,
+    string.ascii_lowercase.encode('ascii') + b' ' * len(_SEPARATORS)
+)
+_TOKEN_DELETE = _ASCII_PUNCTUATION.encode('ascii')
+
+# Approximate number of bytes tokenized at a time
+_READ_CHUNK_SIZE = 1 << 18
+
+# Part of every on-disk cache key. Bump it whenever the tokenizing rules or the
+# pickled format change, so counts from older versions are never reused.
+_CACHE_VERSION = 1
+
+
+def _count_byte_range(filepath: str, start: int, end: int) -> Counter:
+    """
+    Count the words in a byte range of a file, as undecoded byte tokens.
+    
+    The range is memory-mapped and tokenized in line-aligned slices, so
+    memory use is bounded by the slice size and vocabulary rather than the
+    range size. Both ends of the range must be file ends or follow a newline.
+    """
+    byte_counts = Counter()
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while start < end:
+            # End each slice after a newline so no word spans two slices
+            slice_end = mm.find(b'\n', start + _READ_CHUNK_SIZE, end) + 1 or end
+            byte_counts.update(mm[start:slice_end].translate(_TOKEN_TABLE, _TOKEN_DELETE).split())
+            start = slice_end
+    return byte_counts
+
+
+def _split_file(filepath: str, size: int, parts: int) -> List[int]:
+    """Return offsets splitting a file into up to `parts` line-aligned byte ranges."""
+    bounds = [0]
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for part in range(1, parts):
+            bound = mm.find(b'\n', max(size * part // parts, bounds[-1])) + 1
+            if not 0 < bound < size:
+                break
+            bounds.append(bound)
+    bounds.append(size)
+    return bounds
+
+
+def _tokenize_file(filepath: str, size: int, workers: int) -> Counter:
+    """
+    Count every word in a file.
+    
+    The file is tokenized as bytes, so ASCII text is never decoded. With more
+    than one worker, line-aligned ranges of the file are counted in separate
+    processes and merged. Only the distinct words are decoded; those
+    containing non-ASCII characters are re-tokenized as text.
+    """
+    if not size:
+        return Counter()
+    
+    bounds = _split_file(filepath, size, workers) if workers > 1 else [0, size]
+    if len(bounds) == 2:
+        # Small files and files without newlines may yield a single range
+        byte_counts = _count_byte_range(filepath, 0, size)
+    else:
+        # multiprocessing is slow to import, so only parallel counting loads it
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(len(bounds) - 1) as executor:
+            byte_counts = reduce(
+                iadd,
+                executor.map(_count_byte_range, repeat(filepath), bounds[:-1], bounds[1:]),
+                Counter()
+            )
+    return _decode_word_counts(byte_counts)
+
+
+def _count_stream(filepath: str) -> Counter:
+    """
+    Count every word in a file that cannot be memory-mapped, such as a pipe.
+    
+    Whole lines are read in bounded batches so no word spans two batches.
+    """
+    byte_counts = Counter()
+    with open(filepath, 'rb') as f:
+        for lines in iter(lambda: f.readlines(_READ_CHUNK_SIZE), []):
+            byte_counts.update(b''.join(lines).translate(_TOKEN_TABLE, _TOKEN_DELETE).split())
+    return _decode_word_counts(byte_counts)
+
+
+def _split_letters(text: str) -> List[str]:
+    """
+    Split text into words made only of characters for which str.isalpha() holds.
+    
+    Anything else separates words, including digits, underscores and numeric
+    characters such as "²" or "Ⅻ" that regex word classes treat as letters.
+    """
+    return ''.join(ch if ch.isalpha() else ' ' for ch in text).split()
+
+
+def _decode_word_counts(byte_counts: Counter) -> Counter:
+    """
+    Turn counts of byte tokens into counts of lowercase words.
+    
+    Words keep the order in which their tokens were first seen, so ties in
+    the top N still come out in first-seen order.
+    """
+    # Distinct ASCII tokens are already distinct lowercase words, so all-ASCII
+    # text can be decoded straight into the result
+    if all(word.isascii() for word in byte_counts):
+        return Counter({word.decode('ascii'): count for word, count in byte_counts.items()})
+    
+    word_counts = Counter()
+    for word, count in byte_counts.items():
+        if word.isascii():
+            word_counts[word.decode('ascii')] += count
+        else:
+            for part in _split_letters(_CLEAN_SUB('', word.decode('utf-8').lower())):
+                word_counts[part] += count
+    return word_counts
+
+
+# (word, count) pairs kept after filtering, and the sum of their counts
+_WordSelection = Tuple[Tuple[Tuple[str, int], ...], int]
+
+
+def _cache_file(cache_dir: Path, filepath: str, mtime_ns: int, size: int) -> Path:
+    """Return the on-disk cache file for one version of a file."""
+    import hashlib
+    
+    key = f"{_CACHE_VERSION}\0{os.path.abspath(filepath)}\0{mtime_ns}\0{size}".encode('utf-8')
+    return cache_dir / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.pickle"
+
+
+# Number of file versions whose counts and selections are kept in memory
+_MEMORY_CACHE_SIZE = 32
+
+_T = TypeVar('_T')
+
+# Least recently used entries first. Keys hold the file version but not the
+# worker count, which only changes how a miss is computed.
+_count_cache: 'OrderedDict[tuple, Counter]' = OrderedDict()
+_selection_cache: 'OrderedDict[tuple, _WordSelection]' = OrderedDict()
+
+
+def _cached(cache: 'OrderedDict[tuple, _T]', key: tuple, compute: Callable[[], _T]) -> _T:
+    """Return cache[key], calling compute() on a miss and evicting the least recently used entry."""
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = compute()
+    if len(cache) > _MEMORY_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def _load_word_counts(filepath: str, mtime_ns: int, size: int, workers: int,
+                      cache_dir: Optional[Path] = None) -> Counter:
+    """
+    Count every word in a file, reusing counts pickled in cache_dir.
+    
+    Cache files are never pruned, and loading one runs pickle on it, so
+    cache_dir must only be writable by trusted users. A cache file that cannot
+    be loaded as a Counter is treated as a miss.
+    """
+    if cache_dir is None:
+        return _tokenize_file(filepath, size, workers)
+    
+    # pickle is only needed with a cache directory, so it is imported here
+    import pickle
+    
+    cache_file = _cache_file(cache_dir, filepath, mtime_ns, size)
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if isinstance(cached, Counter):
+            return cached
+    except Exception:
+        # Corrupt, truncated or foreign cache files are recomputed
+        pass
+    
+    word_counts = _tokenize_file(filepath, size, workers)
+    # Write to a temporary file first so readers never see a partial cache
+    partial_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(partial_file, 'wb') as f:
+            pickle.dump(word_counts, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial_file, cache_file)
+    except OSError:
+        # The disk cache is only an optimization, but nothing ever prunes
+        # cache_dir, so no partial file is left behind
+        with suppress(OSError):
+            partial_file.unlink()
+    return word_counts
+
+
+def _count_words(filepath: str, mtime_ns: int, size: int, workers: int,
+                 cache_dir: Optional[Path] = None) -> Counter:
+    """
+    Count every word in a file, cached in memory per file version.
+    
+    The modification time and size are only part of the cache key, so an
+    edited file is re-read instead of served stale. The worker count is not,
+    so toggling parallel counting reuses cached counts.
+    The returned Counter is shared between callers and must not be modified.
+    """
+    return _cached(
+        _count_cache, (filepath, mtime_ns, size, cache_dir),
+        lambda: _load_word_counts(filepath, mtime_ns, size, workers, cache_dir)
+    )
+
+
+def _count_file_words(filepath: Path, cache_dir: Optional[Path] = None) -> Counter:
+    """Count every word in a file, reusing cached counts if it is unchanged."""
+    stat = os.stat(filepath)
+    if not stat.st_size:
+        # Files such as those in /proc report no size, so they are streamed
+        return _count_stream(str(filepath))
+    return _count_words(str(filepath), stat.st_mtime_ns, stat.st_size, 1, cache_dir)
+
+
+def _select_words(word_counts: Counter, min_length: int) -> _WordSelection:
+    """Return the (word, count) pairs of at least min_length characters and their total count."""
+    selected = tuple(
+        (word, count) for word, count in word_counts.items() if len(word) >= min_length
+    )
+    return selected, sum(map(itemgetter(1), selected))
+
+
+def _count_directory_words(directory: Path, min_length: int,
+                           cache_dir: Optional[Path] = None) -> _WordSelection:
+    """
+    Count words across every .txt file in a directory.
+    
+    Files are counted in parallel worker processes and the per-file counts
+    are merged before filtering by min_length.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    filepaths = sorted(path for path in directory.glob('*.txt') if path.is_file())
+    with ProcessPoolExecutor() as executor:
+        word_counts = reduce(
+            iadd, executor.map(_count_file_words, filepaths, repeat(cache_dir)), Counter()
+        )
+    return _select_words(word_counts, min_length)
+
+
+def _filter_words(filepath: str, mtime_ns: int, size: int, workers: int,
+                  min_length: int, cache_dir: Optional[Path] = None) -> _WordSelection:
+    """Select words of at least min_length characters from a file, cached per file version."""
+    return _cached(
+        _selection_cache, (filepath, mtime_ns, size, min_length, cache_dir),
+        lambda: _select_words(_count_words(filepath, mtime_ns, size, workers, cache_dir), min_length)
+    )
 
 
 class AnalysisConfig(BaseModel):
     """Configuration model for text analysis parameters."""
     
-    filepath: Path = Field(..., description="Path to the text file to analyze")
+    filepath: Path = Field(..., description="Path to the text file, or directory of .txt files, to analyze")
     top_n: int = Field(10, ge=1, le=100, description="Number of top words to return")
     min_length: int = Field(3, ge=1, le=20, description="Minimum word length to consider")
-    
-    @field_validator('filepath')
-    @classmethod
-    def validate_filepath(cls, v):
-        """Ensure the file exists or can be created."""
-        if not isinstance(v, Path):
-            v = Path(v)
-        return v
-    
-    class Config:
-        arbitrary_types_allowed = True
+    parallel: bool = Field(False, description="Count a single file in parallel chunks")
+    cache_dir: Optional[Path] = Field(None, description="Directory for reusing word counts across runs")
 
 
 class WordFrequency(BaseModel):
     """Model for individual word frequency data."""
     
+    model_config = ConfigDict(frozen=True)
+    
     word: str = Field(..., min_length=1, description="The word")
     count: int = Field(..., ge=1, description="Frequency count")
     percentage: float = Field(..., ge=0, le=100, description="Percentage of total")
@@ -63,9 +338,6 @@ class AnalysisResult(BaseModel):
         if len(self.word_frequencies) > self.unique_words:
             raise ValueError("Cannot have more frequency entries than unique words")
         return self
-    
-    class Config:
-        arbitrary_types_allowed = True
 
 
 class TextAnalyzer:
@@ -74,7 +346,9 @@ class TextAnalyzer:
     @staticmethod
     def clean_text(text: str) -> str:
         """Remove punctuation and convert to lowercase for consistent analysis."""
-        return re.sub(r'[^\w\s]', '', text.lower())
+        if text.isascii():
+            return text.translate(_CLEAN_TABLE)
+        return _CLEAN_SUB('', text.lower())
     
     @staticmethod
     def create_sample_file(filepath: Path) -> None:
@@ -94,6 +368,9 @@ class TextAnalyzer:
         """
         Analyze word frequency in a text file using validated configuration.
         
+        If the configured path is a directory, the word counts of all .txt
+        files in it are combined.
+        
         Args:
             config: Validated AnalysisConfig instance
             
@@ -105,36 +382,47 @@ class TextAnalyzer:
             if not config.filepath.exists():
                 self.create_sample_file(config.filepath)
             
-            # Read and process file
-            content = config.filepath.read_text(encoding='utf-8')
-            cleaned = self.clean_text(content)
-            all_words = cleaned.split()
-            
-            # Filter words by minimum length
-            filtered_words = [word for word in all_words if len(word) >= config.min_length]
+            stat = os.stat(config.filepath)
+            if S_ISDIR(stat.st_mode):
+                selected, total_words = _count_directory_words(
+                    config.filepath, config.min_length, config.cache_dir
+                )
+            elif not S_ISREG(stat.st_mode) or not stat.st_size:
+                # Pipes, device files and /proc or sysfs files report no size,
+                # and their contents change without a new mtime, so they are
+                # streamed and never cached
+                selected, total_words = _select_words(
+                    _count_stream(str(config.filepath)), config.min_length
+                )
+            else:
+                # Count and filter words, reusing earlier results if the file is unchanged
+                workers = (os.cpu_count() or 1) if config.parallel else 1
+                selected, total_words = _filter_words(
+                    str(config.filepath), stat.st_mtime_ns, stat.st_size, workers,
+                    config.min_length, config.cache_dir
+                )
             
-            if not filtered_words:
+            if not selected:
                 print("No words found matching the criteria.")
                 return None
             
-            # Count word frequencies
-            word_counts = Counter(filtered_words)
-            total_words = len(filtered_words)
-            unique_words = len(word_counts)
+            unique_words = len(selected)
             
-            # Create WordFrequency objects for top N words
-            word_frequencies = []
-            for word, count in word_counts.most_common(config.top_n):
-                percentage = (count / total_words) * 100
-                word_freq = WordFrequency(
-                    word=word,
-                    count=count,
-                    percentage=round(percentage, 2)
+            # Select the top N without sorting the whole vocabulary
+            top_words = heapq.nlargest(config.top_n, selected, key=itemgetter(1))
+            
+            # Create WordFrequency objects for top N words. The tokenizer only
+            # yields lowercase words for which str.isalpha() holds, the same
+            # check validate_word makes, so field validation is skipped.
+            scale = 100.0 / total_words
+            word_frequencies = [
+                WordFrequency.model_construct(
+                    word=word, count=count, percentage=round(count * scale, 2)
                 )
-                word_frequencies.append(word_freq)
+                for word, count in top_words
+            ]
             
-            # Return validated result
-            return AnalysisResult(
+            result_fields = dict(
                 filepath=config.filepath,
                 total_words=total_words,
                 unique_words=unique_words,
@@ -142,6 +430,18 @@ class TextAnalyzer:
                 config=config
             )
             
+            # Every field is already validated or built by the analyzer, and
+            # nlargest never returns more rows than unique words, so the result
+            # is only validated when debugging with TFA_VALIDATE=1. Pydantic
+            # does not revalidate model instances, so rows are rebuilt first.
+            if os.environ.get('TFA_VALIDATE') == '1':
+                result_fields['word_frequencies'] = [
+                    WordFrequency.model_validate(wf.model_dump())
+                    for wf in word_frequencies
+                ]
+                return AnalysisResult(**result_fields)
+            return AnalysisResult.model_construct(**result_fields)
+            
         except Exception as e:
             print(f"Error analyzing file: {e}")
             return None
@@ -149,32 +449,34 @@ class TextAnalyzer:
     @staticmethod
     def display_results(result: AnalysisResult) -> None:
         """Display analysis results in a formatted table."""
-        print(f"\nWord Frequency Analysis for: {result.filepath}")
-        print(f"Total words analyzed: {result.total_words}")
-        print(f"Unique words found: {result.unique_words}")
-        print(f"Showing top {len(result.word_frequencies)} words")
-        print("-" * 50)
-        print(f"{'Word':<15} {'Count':<8} {'Percentage'}")
-        print("-" * 50)
+        lines = [
+            f"\nWord Frequency Analysis for: {result.filepath}",
+            f"Total words analyzed: {result.total_words}",
+            f"Unique words found: {result.unique_words}",
+            f"Showing top {len(result.word_frequencies)} words",
+            "-" * 50,
+            f"{'Word':<15} {'Count':<8} {'Percentage'}",
+            "-" * 50,
+        ]
+        lines.extend(
+            f"{word_freq.word:<15} {word_freq.count:<8} {word_freq.percentage:.1f}%"
+            for word_freq in result.word_frequencies
+        )
         
-        for word_freq in result.word_frequencies:
-            print(f"{word_freq.word:<15} {word_freq.count:<8} {word_freq.percentage:.1f}%")
-
-
-def main(
-    file: Path =
-        typer.Argument(..., help="Path to text file to analyze"),
-    top_n: int =
-        typer.Option(10, "-n", "--top_n", help="Number of top words to show (default: 10)"),
-    min_word_length: int =
-        typer.Option(3, "-m", "--min_word_length", help="Minimum word length (default: 3)")
-):    
+        # Write the whole table at once rather than one print per row
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def main(file: Path, top_n: int = 10, min_word_length: int = 3, parallel: bool = False,
+         cache_dir: Optional[Path] = None) -> None:
     try:
         # Create and validate configuration
         config = AnalysisConfig(
             filepath=file,
             top_n=top_n,
-            min_length=min_word_length
+            min_length=min_word_length,
+            parallel=parallel,
+            cache_dir=cache_dir
         )
         
         # Perform analysis
@@ -185,14 +487,40 @@ def main(
             analyzer.display_results(result)
             
             # Example of accessing validated data
-            print(f"\nConfiguration used:")
-            print(f"  File: {result.config.filepath}")
-            print(f"  Top N: {result.config.top_n}")
-            print(f"  Min length: {result.config.min_length}")
+            sys.stdout.write(
+                f"\nConfiguration used:\n"
+                f"  File: {result.config.filepath}\n"
+                f"  Top N: {result.config.top_n}\n"
+                f"  Min length: {result.config.min_length}\n"
+            )
             
     except Exception as e:
         print(f"Configuration error: {e}")
 
 
+def _run_cli() -> None:
+    """Run main() as a typer command-line application."""
+    # typer is only needed on the command line, so it is not imported with the module
+    import typer
+    
+    def cli(
+        file: Path =
+            typer.Argument(..., help="Path to text file, or directory of .txt files, to analyze"),
+        top_n: int =
+            typer.Option(10, "-n", "--top_n", help="Number of top words to show (default: 10)"),
+        min_word_length: int =
+            typer.Option(3, "-m", "--min_word_length", help="Minimum word length (default: 3)"),
+        parallel: bool =
+            typer.Option(False, "-p", "--parallel", help="Count a large file in parallel chunks (default: off)"),
+        cache_dir: Optional[Path] =
+            typer.Option(None, "-c", "--cache_dir", help="Directory for caching word counts between runs (default: none). "
+                         "Old entries are never pruned, and cache files are loaded with pickle, "
+                         "so only use a directory that untrusted users cannot write to")
+    ):
+        main(file, top_n, min_word_length, parallel, cache_dir)
+    
+    typer.run(cli)
+
+
 if __name__ == "__main__":
-    typer.run(main)
+    _run_cli()